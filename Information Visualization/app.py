@@ -9,10 +9,12 @@ from industries.main import get_industries_layout, register_industries_callbacks
 from companies.main import get_companies_layout, register_company_callbacks, all_companies, default_companies
 from listings.main import get_listings_layout, register_listings
 from constants.default import defaultJobTitle
+from shared.cache import cache
 
 # App setup
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
 app.title = "JobBuddy"
+cache.init_app(app.server, config={"CACHE_TYPE": "SimpleCache", "CACHE_THRESHOLD": 256})
 
 # Sidebar
 sidebar = dbc.Col(
@@ -31,7 +33,33 @@ sidebar = dbc.Col(
             style={"backgroundColor": "#1c1c1c"}
         ),
 
-        html.Div(id="dynamic-dropdown-container")
+        html.Div([
+            html.Label("Select Companies", className="text-white"),
+            dcc.Dropdown(
+                id='company-dropdown',
+                options=[{"label": c, "value": c} for c in all_companies],
+                value=default_companies,
+                multi=True,
+                persistence=True,
+                persistence_type='memory',
+                className="mb-4",
+                style={"backgroundColor": "#1c1c1c"}
+            )
+        ], id="company-dropdown-container", style={"display": "none"}),
+
+        html.Div([
+            html.Label("Select Industries", className="text-white"),
+            dcc.Dropdown(
+                id='industry-dropdown',
+                options=[{"label": ind, "value": ind} for ind in all_industries],
+                value=default_industries,
+                multi=True,
+                persistence=True,
+                persistence_type='memory',
+                className="mb-4",
+                style={"backgroundColor": "#1c1c1c"}
+            )
+        ], id="industry-dropdown-container")
     ],
     width=3,
     style={"backgroundColor": "#343a40", "padding": "20px", "minHeight": "100vh", "overflow": "hidden"}
@@ -50,73 +78,66 @@ tabs_component = dbc.Row([
     )
 ], style={"position": "sticky", "top": 0, "zIndex": 1000, "backgroundColor": "#1e1e1e"})
 
+# Tab contents, rendered once and shown or hidden in the browser
+tab_panels = {
+    "industries": html.Div([
+        dbc.Row([get_industries_layout()]),
+        html.Br(),
+    ]),
+    "companies": html.Div([
+        dbc.Row([get_companies_layout()]),
+        html.Br(),
+    ]),
+    "jobs": get_jobs_layout(),
+    "listings": html.Div([
+        dbc.Row([get_listings_layout()]),
+        html.Br(),
+    ]),
+}
+
 # Layout
 app.layout = dbc.Container([
     dbc.Row([
         sidebar,
         dbc.Col([
             tabs_component,
-            html.Div(id="tab-content")
+            html.Div([
+                html.Div(content, id=f"{tab}-panel", style={"display": "block" if tab == "industries" else "none"})
+                for tab, content in tab_panels.items()
+            ], id="tab-content")
         ], width=9, style={"maxHeight": "100vh", "overflowY": "auto"})
     ])
 ], fluid=True, style={"backgroundColor": "#1e1e1e", "minHeight": "100vh"})
 
-# Tab routing
-@app.callback(Output("tab-content", "children"), Input("tabs", "active_tab"))
-def render_tab(tab):
-    if tab == "industries":
-        return html.Div([
-            dbc.Row([get_industries_layout()]),
-            html.Br(),
-        ])
-    elif tab == "companies":
-       return html.Div([
-            dbc.Row([get_companies_layout()]),
-            html.Br(),
-        ])
-    elif tab == "jobs":
-        return get_jobs_layout()
-    elif tab == "listings":
-        return html.Div([
-            dbc.Row([get_listings_layout()]),
-            html.Br(),
-        ])
-
-# Sidebar dynamic filter update
-@app.callback(
-    Output("dynamic-dropdown-container", "children"),
+# Tab routing, done clientside so switching tabs needs no server round-trip
+app.clientside_callback(
+    """
+    function(tab) {
+        return ["industries", "companies", "jobs", "listings"].map(function(id) {
+            return {"display": id === tab ? "block" : "none"};
+        });
+    }
+    """,
+    [Output(f"{tab}-panel", "style") for tab in tab_panels],
     Input("tabs", "active_tab")
 )
-def toggle_dropdown(tab):
-    if tab == "companies" or tab == "listings":
-        return [
-            html.Label("Select Companies", className="text-white"),
-            dcc.Dropdown(
-                id='company-dropdown',
-                options=[{"label": c, "value": c} for c in all_companies],
-                value=default_companies,
-                multi=True,
-                persistence=True,
-                persistence_type='memory',
-                className="mb-4",
-                style={"backgroundColor": "#1c1c1c"}
-            )
-        ]
-    elif tab == "industries" or tab == "listings":
+
+# Sidebar filter visibility, toggled clientside like the tab panels
+app.clientside_callback(
+    """
+    function(tab) {
+        var showCompanies = tab === "companies" || tab === "listings";
+        var showIndustries = tab === "industries" || tab === "listings";
         return [
-            html.Label("Select Industries", className="text-white"),
-            dcc.Dropdown(
-                id='industry-dropdown',
-                options=[{"label": ind, "value": ind} for ind in all_industries],
-                value=default_industries,
-                multi=True,
-                persistence=True,
-                persistence_type='memory',
-                className="mb-4",
-                style={"backgroundColor": "#1c1c1c"}
-            )
-        ]
-    return []
+            {"display": showCompanies ? "block" : "none"},
+            {"display": showIndustries ? "block" : "none"}
+        ];
+    }
+    """,
+    [Output("company-dropdown-container", "style"),
+     Output("industry-dropdown-container", "style")],
+    Input("tabs", "active_tab")
+)
 
 # Register callbacks
 register_jobs_callbacks(app)
@@ -1,12 +1,45 @@
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from dash import dcc, Input, Output
-from shared.utils import job_titles
+from shared.data import df_jobs
+from shared.cache import cache
+
+# Job counts per (company, title), computed once so callbacks only filter
+company_title_counts = (
+    df_jobs.groupby(['company_name', 'title'], observed=True)
+    .size()
+    .rename('Number of Jobs')
+    .reset_index()
+    .rename(columns={'company_name': 'Company', 'title': 'Job Title'})
+)
+
+# Job count and first row per (title, company) for the dropdown callback; kept
+# long-form because a dense title x company table would be almost entirely zeros
+title_company_counts = (
+    df_jobs[['title', 'company_name']]
+    .assign(row=range(len(df_jobs)))
+    .groupby(['title', 'company_name'], observed=True)['row']
+    .agg(count='size', first_row='min')
+)
 
-# Load data
-df_jobs = pd.read_csv('data/cleaned.csv')
-df_jobs = job_titles(df_jobs)
+def company_counts_for(titles):
+    return (
+        title_company_counts[title_company_counts.index.get_level_values('title').isin(titles)]
+        .groupby(level='company_name', observed=True)
+        .agg({'count': 'sum', 'first_row': 'min'})
+    )
+
+# Companies with the most jobs in counts; ties go to the company whose first job
+# comes first, the order value_counts gave on the raw rows
+def top_companies(counts, n=10):
+    return (
+        counts
+        .sort_values(['count', 'first_row'], ascending=[False, True])
+        .head(n)
+        .index
+        .tolist()
+    )
 
 # Get all company names
 company_counts = df_jobs['company_name'].value_counts().reset_index()
@@ -16,15 +49,7 @@ all_companies = company_counts['Company'].dropna().tolist()
 
 # Default company filter based on default job title
 default_title = "Marketing Coordinator"
-default_jobs = df_jobs[df_jobs['title'] == default_title]
-default_companies = (
-    default_jobs['company_name']
-    .value_counts()
-    .dropna()
-    .head(10)
-    .index
-    .tolist()
-)
+default_companies = top_companies(company_counts_for([default_title]))
 
 def get_company_component():
     return dbc.Col(
@@ -32,6 +57,99 @@ def get_company_component():
         width=12
     )
 
+# Figure pieces that never change, built once; callbacks only fill in traces
+def empty_state_figure(title, message):
+    return px.bar(
+        title=title,
+        template='plotly_dark'
+    ).update_layout(
+        height=600,
+        margin=dict(b=100),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[dict(
+            text=message,
+            xref="paper", yref="paper",
+            showarrow=False,
+            font=dict(size=16, color="white")
+        )]
+    ).to_plotly_json()
+
+no_titles_figure = empty_state_figure("No job titles selected", "Please select at least one job title")
+no_companies_figure = empty_state_figure("No companies selected", "Please select at least one company")
+
+bar_layout = go.Layout(
+    template='plotly_dark',
+    barmode='group',
+    xaxis=dict(title_text='Company', tickangle=-45, categoryorder='array'),
+    yaxis=dict(
+        title_text='Number of Jobs',
+        tickmode='linear',
+        dtick=1,
+        tickformat='d'
+    ),
+    height=600,
+    margin=dict(b=100),
+    hovermode='closest',
+    clickmode='event+select',
+    legend_title_text='Job Titles'
+).to_plotly_json()
+
+bar_trace_style = go.Bar(
+    hovertemplate='<b>%{data.name}</b><br>Jobs: %{y}<extra></extra>',
+    hoverlabel=dict(
+        bgcolor="black",
+        font_size=14,
+        font_family="Arial",
+        font_color="white"
+    ),
+    selected=dict(marker=dict(opacity=1)),
+    unselected=dict(marker=dict(opacity=0.1))
+).to_plotly_json()
+
+# Figure per (companies, titles) selection as plotly JSON, memoized across callbacks
+@cache.memoize()
+def company_figure(selected_companies, selected_titles):
+    if not selected_titles:
+        return no_titles_figure
+
+    if not selected_companies:
+        return no_companies_figure
+
+    stacked_df = company_title_counts[
+        company_title_counts['Company'].isin(selected_companies) &
+        company_title_counts['Job Title'].isin(selected_titles)
+    ]
+
+    if stacked_df.empty:
+        title = 'No matching jobs found for the selected criteria'
+        data = [dict(
+            type='bar',
+            x=list(selected_companies),
+            y=[0] * len(selected_companies),
+            hovertemplate='Company=%{x}<br>Number of Jobs=%{y}<extra></extra>'
+        )]
+    else:
+        title = 'No: of Jobs by Company and Title'
+        rows_by_title = dict(tuple(stacked_df.groupby('Job Title', observed=True)))
+        data = [
+            dict(
+                bar_trace_style,
+                name=job_title,
+                x=rows_by_title[job_title]['Company'].tolist(),
+                y=rows_by_title[job_title]['Number of Jobs'].tolist()
+            )
+            for job_title in selected_titles if job_title in rows_by_title
+        ]
+
+    layout = dict(
+        bar_layout,
+        title=dict(text=title),
+        xaxis=dict(bar_layout['xaxis'], categoryarray=list(selected_companies))
+    )
+
+    return dict(data=data, layout=layout)
+
 def register_company_callbacks(app):
     @app.callback(
         Output('company-bar-chart', 'figure'),
@@ -40,102 +158,7 @@ def register_company_callbacks(app):
         prevent_initial_call=True
     )
     def update_graph(selected_companies, selected_titles):
-        if not selected_titles:
-            return px.bar(
-                title="No job titles selected",
-                template='plotly_dark'
-            ).update_layout(
-                height=600,
-                margin=dict(b=100),
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                annotations=[dict(
-                    text="Please select at least one job title",
-                    xref="paper", yref="paper",
-                    showarrow=False,
-                    font=dict(size=16, color="white")
-                )]
-            )
-
-        if not selected_companies:
-            return px.bar(
-                title="No companies selected",
-                template='plotly_dark'
-            ).update_layout(
-                height=600,
-                margin=dict(b=100),
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                annotations=[dict(
-                    text="Please select at least one company",
-                    xref="paper", yref="paper",
-                    showarrow=False,
-                    font=dict(size=16, color="white")
-                )]
-            )
-
-        stacked_data = []
-
-        for company in selected_companies:
-            jobs_in_company = df_jobs[df_jobs['company_name'] == company]
-
-            for title in selected_titles:
-                count = jobs_in_company[jobs_in_company['title'] == title].shape[0]
-                if count > 0:
-                    stacked_data.append({
-                        'Company': company,
-                        'Job Title': title,
-                        'Number of Jobs': count
-                    })
-
-        stacked_df = pd.DataFrame(stacked_data)
-
-        if stacked_df.empty:
-            fig = px.bar(
-                pd.DataFrame({'Company': selected_companies, 'Number of Jobs': [0] * len(selected_companies)}),
-                x='Company',
-                y='Number of Jobs',
-                title='No matching jobs found for the selected criteria',
-                template='plotly_dark'
-            )
-        else:
-            fig = px.bar(
-                stacked_df,
-                x='Company',
-                y='Number of Jobs',
-                color='Job Title',
-                title='No: of Jobs by Company and Title',
-                template='plotly_dark',
-                barmode='group'
-            )
-
-            fig.update_traces(
-                hovertemplate='<b>%{data.name}</b><br>Jobs: %{y}<extra></extra>',
-                hoverlabel=dict(
-                    bgcolor="black",
-                    font_size=14,
-                    font_family="Arial",
-                    font_color="white"
-                ),
-                selected=dict(marker=dict(opacity=1)),
-                unselected=dict(marker=dict(opacity=0.1))
-            )
-
-        fig.update_layout(
-            xaxis_tickangle=-45,
-            height=600,
-            margin=dict(b=100),
-            hovermode='closest',
-            clickmode='event+select',
-            yaxis=dict(
-                tickmode='linear',
-                dtick=1,
-                tickformat='d'
-            ),
-            legend_title_text='Job Titles'
-        )
-
-        return fig
+        return company_figure(tuple(selected_companies or ()), tuple(selected_titles or ()))
 
     @app.callback(
         Output('company-dropdown', 'options'),
@@ -146,18 +169,11 @@ def register_company_callbacks(app):
         if not selected_titles:
             return [], []
 
-        filtered = df_jobs[df_jobs['title'].isin(selected_titles)]
-        options = sorted(filtered['company_name'].dropna().unique().tolist())
-        top_companies = (
-            filtered['company_name']
-            .value_counts()
-            .dropna()
-            .head(10)
-            .index
-            .tolist()
-        )
-
-        return [{'label': c, 'value': c} for c in options], top_companies
+        counts = company_counts_for(selected_titles)
+
+        options = sorted(counts.index.tolist())
+
+        return [{'label': c, 'value': c} for c in options], top_companies(counts)
 
 # Export shared data
 __all__ = ['get_company_component', 'register_company_callbacks', 'all_companies', 'default_companies']
@@ -1,23 +1,48 @@
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from dash import dcc, Input, Output
-from shared.utils import job_titles
+from shared.data import df_jobs, df_industries
+from shared.cache import cache
 
-# Load data
-df_industries = pd.read_csv('data/job_industries.csv')
-ind = pd.read_csv('data/industries.csv')
-df_jobs = pd.read_csv('data/cleaned.csv')
+# Join tables to connect industries with job titles
+industry_jobs = pd.merge(df_industries, df_jobs, on='job_id', how='inner')
 
-# Clean job titles as done in radar.py
-df_jobs = job_titles(df_jobs)
+# Job counts per (industry, title), computed once so callbacks only filter
+industry_title_counts = (
+    industry_jobs.groupby(['industry_name', 'title'], sort=False, observed=True)
+    .size()
+    .reset_index(name='Number of Jobs')
+    .rename(columns={'industry_name': 'Industry', 'title': 'Job Title'})
+)
 
-# Map industry IDs to names
-industry_mapping = dict(zip(ind['industry_id'], ind['industry_name']))
-df_industries['industry_name'] = df_industries['industry_id'].map(industry_mapping)
+# Job count and first row per (title, industry), so the dropdown callback sums rows
+# instead of merging
+title_industry_counts = (
+    industry_jobs[['title', 'industry_name']]
+    .assign(row=range(len(industry_jobs)))
+    .groupby(['title', 'industry_name'], observed=True)['row']
+    .agg(count='size', first_row='min')
+)
 
-# Join tables to connect industries with job titles
-industry_jobs = pd.merge(df_industries, df_jobs, on='job_id', how='inner')
+def industry_counts_for(titles):
+    return (
+        title_industry_counts[title_industry_counts.index.get_level_values('title').isin(titles)]
+        .groupby(level='industry_name', observed=True)
+        .agg({'count': 'sum', 'first_row': 'min'})
+    )
+
+# Industries with the most jobs in counts; ties go to the industry whose first job
+# comes first, the order value_counts gave on the merged rows
+def top_industries(counts, n=10):
+    return (
+        counts
+        .sort_values(['count', 'first_row'], ascending=[False, True])
+        .head(n)
+        .index
+        .tolist()
+    )
 
 # Get all industry names
 industry_counts = df_industries['industry_name'].value_counts().reset_index()
@@ -27,17 +52,7 @@ all_industries = industry_counts['Industry'].tolist()
 
 # Compute default industries based on the default job title
 default_title = "Marketing Coordinator"
-default_job_ids = df_jobs[df_jobs['title'] == default_title]['job_id'].unique()
-default_industry_jobs = df_industries[df_industries['job_id'].isin(default_job_ids)]
-industry_counts_default = (
-    default_industry_jobs['industry_name']
-    .value_counts()
-    .dropna()
-    .head(10)
-    .index
-    .tolist()
-)
-default_industries = industry_counts_default
+default_industries = top_industries(industry_counts_for([default_title]))
 
 def get_industry_component():
     return dbc.Col(
@@ -45,6 +60,96 @@ def get_industry_component():
         width=12
     )
 
+# Figure pieces that never change, built once; callbacks only fill in traces
+def empty_state_figure(title, message):
+    return px.bar(
+        title=title,
+        template='plotly_dark'
+    ).update_layout(
+        height=600,
+        margin=dict(b=100),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[dict(
+            text=message,
+            xref="paper", yref="paper",
+            showarrow=False,
+            font=dict(size=16, color="white")
+        )]
+    ).to_plotly_json()
+
+no_titles_figure = empty_state_figure("No job titles selected", "Please select at least one job title")
+no_industries_figure = empty_state_figure("No industries selected", "Please select at least one industry")
+
+bar_layout = go.Layout(
+    template='plotly_dark',
+    barmode='group',
+    xaxis=dict(title_text='Industry', tickangle=-45, categoryorder='array'),
+    yaxis=dict(
+        title_text='Number of Jobs',
+        tickmode='linear',
+        dtick=1,
+        tickformat='d'
+    ),
+    height=600,
+    margin=dict(b=100),
+    hovermode='closest',
+    legend_title_text='Job Titles'
+).to_plotly_json()
+
+bar_trace_style = go.Bar(
+    hovertemplate='<b>%{data.name}</b><br>Jobs: %{y}<extra></extra>',
+    hoverlabel=dict(
+        bgcolor="black",
+        font_size=14,
+        font_family="Arial",
+        font_color="white"
+    )
+).to_plotly_json()
+
+# Figure per (industries, titles) selection as plotly JSON, memoized across callbacks
+@cache.memoize()
+def industry_figure(selected_industries, selected_titles):
+    if not selected_titles:
+        return no_titles_figure
+
+    if not selected_industries:
+        return no_industries_figure
+
+    stacked_df = industry_title_counts[
+        industry_title_counts['Industry'].isin(selected_industries) &
+        industry_title_counts['Job Title'].isin(selected_titles)
+    ]
+
+    if stacked_df.empty:
+        title = 'No matching jobs found for the selected criteria'
+        data = [dict(
+            type='bar',
+            x=list(selected_industries),
+            y=[0] * len(selected_industries),
+            hovertemplate='Industry=%{x}<br>Number of Jobs=%{y}<extra></extra>'
+        )]
+    else:
+        title = 'No: of Jobs by Industry and Title'
+        rows_by_title = dict(tuple(stacked_df.groupby('Job Title', observed=True)))
+        data = [
+            dict(
+                bar_trace_style,
+                name=job_title,
+                x=rows_by_title[job_title]['Industry'].tolist(),
+                y=rows_by_title[job_title]['Number of Jobs'].tolist()
+            )
+            for job_title in selected_titles if job_title in rows_by_title
+        ]
+
+    layout = dict(
+        bar_layout,
+        title=dict(text=title),
+        xaxis=dict(bar_layout['xaxis'], categoryarray=list(selected_industries))
+    )
+
+    return dict(data=data, layout=layout)
+
 def register_industry_callbacks(app):
     @app.callback(
         Output('industry-bar-chart', 'figure'),
@@ -53,102 +158,7 @@ def register_industry_callbacks(app):
         prevent_initial_call=True
     )
     def update_graph(selected_industries, selected_titles):
-        if not selected_titles or len(selected_titles) == 0:
-            return px.bar(
-                title="No job titles selected",
-                template='plotly_dark'
-            ).update_layout(
-                height=600,
-                margin=dict(b=100),
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                annotations=[dict(
-                    text="Please select at least one job title",
-                    xref="paper", yref="paper",
-                    showarrow=False,
-                    font=dict(size=16, color="white")
-                )]
-            )
-
-        if not selected_industries or len(selected_industries) == 0:
-            return px.bar(
-                title="No industries selected",
-                template='plotly_dark'
-            ).update_layout(
-                height=600,
-                margin=dict(b=100),
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                annotations=[dict(
-                    text="Please select at least one industry",
-                    xref="paper", yref="paper",
-                    showarrow=False,
-                    font=dict(size=16, color="white")
-                )]
-            )
-
-        titles_to_show = selected_titles if selected_titles and len(selected_titles) > 0 else df_jobs['title'].unique()
-
-        stacked_data = []
-
-        for industry in selected_industries:
-            industry_job_ids = df_industries[df_industries['industry_name'] == industry]['job_id'].unique()
-            industry_jobs = df_jobs[df_jobs['job_id'].isin(industry_job_ids)]
-
-            for title in titles_to_show:
-                count = industry_jobs[industry_jobs['title'] == title].shape[0]
-                if count > 0:
-                    stacked_data.append({
-                        'Industry': industry,
-                        'Job Title': title,
-                        'Number of Jobs': count
-                    })
-
-        stacked_df = pd.DataFrame(stacked_data)
-
-        if stacked_df.empty:
-            fig = px.bar(
-                pd.DataFrame({'Industry': selected_industries, 'Number of Jobs': [0] * len(selected_industries)}),
-                x='Industry',
-                y='Number of Jobs',
-                title='No matching jobs found for the selected criteria',
-                template='plotly_dark'
-            )
-        else:
-            fig = px.bar(
-                stacked_df,
-                x='Industry',
-                y='Number of Jobs',
-                color='Job Title',
-                title='No: of Jobs by Industry and Title',
-                template='plotly_dark',
-                barmode='group'
-            )
-
-            fig.update_traces(
-                hovertemplate='<b>%{data.name}</b><br>Jobs: %{y}<extra></extra>',
-                hoverlabel=dict(
-                    bgcolor="black",
-                    font_size=14,
-                    font_family="Arial",
-                    font_color="white"
-                )
-            )
-
-        fig.update_layout(
-            xaxis_tickangle=-45,
-            height=600,
-            margin=dict(b=100),
-            hovermode='closest',
-            yaxis=dict(
-                tickmode='linear',
-                dtick=1,
-                tickformat='d'
-            ),
-            legend_title_text='Job Titles'
-        )
-
-        return fig
+        return industry_figure(tuple(selected_industries or ()), tuple(selected_titles or ()))
 
     @app.callback(
         Output('industry-dropdown', 'options'),
@@ -159,20 +169,11 @@ def register_industry_callbacks(app):
         if not selected_titles:
             return [], []
 
-        filtered_jobs = df_jobs[df_jobs['title'].isin(selected_titles)]
-        merged = pd.merge(df_industries, filtered_jobs, on='job_id', how='inner')
+        counts = industry_counts_for(selected_titles)
 
-        options = sorted(merged['industry_name'].dropna().unique().tolist())
-        top_industries = (
-            merged['industry_name']
-            .value_counts()
-            .dropna()
-            .head(10)
-            .index
-            .tolist()
-        )
+        options = sorted(counts.index.tolist())
 
-        return [{'label': ind, 'value': ind} for ind in options], top_industries
+        return [{'label': ind, 'value': ind} for ind in options], top_industries(counts)
 
 # Export shared data
 __all__ = ['get_industry_component', 'register_industry_callbacks', 'all_industries', 'default_industries']
@@ -1,21 +1,56 @@
-import pandas as pd
+import numpy as np
 import plotly.express as px
 from dash import dcc, html
 import dash_bootstrap_components as dbc
+from shared.data import df_jobs
 
-# Load and preprocess the data
-df = pd.read_csv("data/cleaned.csv")
-df['listed_datetime'] = pd.to_datetime(df['original_listed_time'], unit='ms')
-df['YearMonth'] = df['listed_datetime'].dt.to_period('M').astype(str)
+# Preprocess the data
+listed_datetime = df_jobs['original_listed_time'].dt.tz_localize(None)
+year_month = listed_datetime.dt.to_period('M').astype(str).rename('YearMonth')
 
-monthly_counts = df.groupby('YearMonth').size().reset_index(name='Job Postings')
+monthly_counts = df_jobs.groupby(year_month).size().reset_index(name='Job Postings')
+
+# Most points drawn in the line chart; longer series are downsampled
+MAX_POINTS = 1000
+
+def lttb_indices(y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that keep the shape of the line."""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = [0]
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point) is the triangle's third corner
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        prev_x, prev_y = x[selected[-1]], y[selected[-1]]
+        area = np.abs((prev_x - next_x) * (y[lo:hi] - prev_y) - (prev_x - x[lo:hi]) * (next_y - prev_y))
+        selected.append(lo + int(area.argmax()))
+
+    selected.append(n - 1)
+    return np.array(selected)
+
+plotted_counts = monthly_counts.iloc[lttb_indices(monthly_counts['Job Postings'].to_numpy(), MAX_POINTS)]
 
 # Layout component for line chart
 def get_line_chart():
     return dbc.Col([
         dcc.Graph(
             figure=px.line(
-                monthly_counts,
+                plotted_counts,
                 x='YearMonth',
                 y='Job Postings',
                 title='Job Postings Trends by Month',
@@ -1,24 +1,103 @@
+import math
+import re
 import pandas as pd
 import dash_bootstrap_components as dbc
-from dash import dcc, html, dash_table, Input, Output
-from shared.utils import job_titles
+from dash import dcc, html, dash_table, Input, Output, ctx
+from shared.data import df_jobs, df_industries
+from shared.cache import cache
 
-# Load and clean data
-df_jobs = pd.read_csv("data/cleaned.csv")
-df_jobs = job_titles(df_jobs)
+# Merge job & industry
+df_merged = pd.merge(df_jobs, df_industries[['job_id', 'industry_name']], on='job_id', how='left')
 
-# Convert timestamp
-df_jobs['original_listed_time'] = pd.to_datetime(df_jobs['original_listed_time'].astype(float), unit='ms', utc=True)
-df_jobs['listed_date'] = df_jobs['original_listed_time'].dt.strftime('%b %d, %Y')
+# Format timestamp
+df_merged['listed_date'] = df_merged['original_listed_time'].dt.strftime('%b %d, %Y')
 
-# Merge industry data
-df_industries = pd.read_csv('data/job_industries.csv')
-ind = pd.read_csv('data/industries.csv')
-industry_mapping = dict(zip(ind['industry_id'], ind['industry_name']))
-df_industries['industry_name'] = df_industries['industry_id'].map(industry_mapping)
+# Salary range never changes, so format it once
+min_salary, max_salary = df_merged['min_salary'], df_merged['max_salary']
+df_merged['salary_range'] = (
+    '$' + min_salary.astype(str) + ' - $' + max_salary.astype(str)
+).where(min_salary.notna() & max_salary.notna(), 'N/A')
 
-# Merge job & industry
-df_merged = pd.merge(df_jobs, df_industries[['job_id', 'industry_name']], on='job_id', how='left')
+# Columns shown in the table
+df_listings_view = df_merged[[
+    'title', 'company_name', 'industry_name', 'location',
+    'formatted_work_type', 'formatted_experience_level',
+    'salary_range', 'listed_date'
+]].reset_index(drop=True)
+
+# Table rows built once; callbacks pick rows by position instead of calling to_dict
+listings_records = df_listings_view.to_dict('records')
+
+# Filter operators the DataTable can put in filter_query, keyed by token
+filter_operators = [
+    ['ge', '>='],
+    ['le', '<='],
+    ['lt', '<'],
+    ['gt', '>'],
+    ['ne', '!='],
+    ['eq', '='],
+    ['contains'],
+    ['datestartswith'],
+]
+filter_operator_names = {
+    token: operator_type[0] for operator_type in filter_operators for token in operator_type
+}
+
+# "{column} operator value"; the operator is the single token after the column
+filter_part_pattern = re.compile(r'^\{(.+?)\}\s+(\S+)\s*(.*)$')
+
+def split_filter_part(filter_part):
+    match = filter_part_pattern.match(filter_part.strip())
+    if match is None:
+        return None, None, None
+    name, token, value_part = match.groups()
+
+    # Tokens may carry an s/i case prefix, e.g. "scontains" or "i="
+    operator = filter_operator_names.get(token)
+    if operator is None and token[:1] in ('s', 'i'):
+        operator = filter_operator_names.get(token[1:])
+    if operator is None:
+        return None, None, None
+
+    # Values stay strings as typed; numeric comparisons parse them themselves
+    value_part = value_part.strip()
+    quote = value_part[0] if value_part else ''
+    if quote in ("'", '"', '`') and len(value_part) > 1 and value_part[-1] == quote:
+        value = value_part[1:-1].replace('\\' + quote, quote)
+    else:
+        value = value_part
+
+    return name, operator, value
+
+def apply_filter_query(df, filter_query):
+    for filter_part in filter_query.split(' && '):
+        col_name, operator, value = split_filter_part(filter_part)
+        if col_name not in df.columns:
+            continue
+
+        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            df = df[compare_column(df[col_name], operator, value)]
+            continue
+
+        column = df[col_name].astype(str)
+        if operator == 'contains':
+            df = df[column.str.contains(value, regex=False)]
+        elif operator == 'datestartswith':
+            df = df[column.str.startswith(value)]
+
+    return df
+
+def compare_column(column, operator, value):
+    # Numbers compare as numbers when every present value parses, so "10" > "3"
+    # and 5 = 5.0; otherwise fall back to comparing the text
+    numeric = pd.to_numeric(column, errors='coerce')
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is not None and numeric.notna().equals(column.notna()):
+        return getattr(numeric, operator)(number)
+    return getattr(column.astype(str), operator)(value)
 
 # Layout component
 def get_listings_component():
@@ -50,9 +129,14 @@ def get_listings_component():
                 'font_size': '14px',
                 'padding': '8px'
             },
+            page_current=0,
             page_size=15,
-            sort_action="native",
-            filter_action="native",
+            page_action="custom",
+            sort_action="custom",
+            sort_mode="single",
+            sort_by=[],
+            filter_action="custom",
+            filter_query="",
             style_data_conditional=[
                 {
                     'if': {'row_index': 'odd'},
@@ -63,37 +147,70 @@ def get_listings_component():
         width=12
     )
 
+# Row positions matching one selection/filter/sort state, memoized across callbacks.
+# Pages are sliced from this, so paging never adds cache entries; free-text
+# filters still would, hence the short timeout
+@cache.memoize(timeout=300)
+def listings_rows(titles, industries, companies, sort_by, filter_query):
+    filtered = df_listings_view
+
+    if titles:
+        filtered = filtered[filtered['title'].isin(titles)]
+    if industries:
+        filtered = filtered[filtered['industry_name'].isin(industries)]
+    if companies:
+        filtered = filtered[filtered['company_name'].isin(companies)]
+    if filter_query:
+        filtered = apply_filter_query(filtered, filter_query)
+
+    if sort_by:
+        filtered = filtered.sort_values(
+            [col for col, _ in sort_by],
+            ascending=[direction == 'asc' for _, direction in sort_by]
+        )
+
+    return filtered.index.to_numpy()
+
+def listings_page(titles, industries, companies, page_current, page_size, sort_by, filter_query):
+    rows = listings_rows(titles, industries, companies, sort_by, filter_query)
+
+    # A narrower selection can leave fewer pages than the one being shown
+    page_count = max(1, math.ceil(len(rows) / page_size))
+    page_current = min(page_current, page_count - 1)
+    start = page_current * page_size
+
+    return [listings_records[i] for i in rows[start:start + page_size]], page_count, page_current
+
 # Register callback
 def register_listings_callbacks(app):
     @app.callback(
         Output('job-listings-table', 'data'),
+        Output('job-listings-table', 'page_count'),
+        Output('job-listings-table', 'page_current'),
         [
             Input('title-selector', 'value'),
             Input('industry-dropdown', 'value'),
-            Input('company-dropdown', 'value')
+            Input('company-dropdown', 'value'),
+            Input('job-listings-table', 'page_current'),
+            Input('job-listings-table', 'page_size'),
+            Input('job-listings-table', 'sort_by'),
+            Input('job-listings-table', 'filter_query')
         ]
     )
-    def update_table(titles, industries, companies):
-        filtered = df_merged.copy()
-
-        if titles:
-            filtered = filtered[filtered['title'].isin(titles)]
-        if industries:
-            filtered = filtered[filtered['industry_name'].isin(industries)]
-        if companies:
-            filtered = filtered[filtered['company_name'].isin(companies)]
-
-        # Create salary range column
-        filtered['salary_range'] = filtered.apply(
-            lambda row: f"${row['min_salary']} - ${row['max_salary']}" if pd.notnull(row['min_salary']) and pd.notnull(row['max_salary']) else "N/A",
-            axis=1
-        )
+    def update_table(titles, industries, companies, page_current, page_size, sort_by, filter_query):
+        # Any change other than paging shows a new result set, so start it on its first page
+        if 'job-listings-table.page_current' not in ctx.triggered_prop_ids:
+            page_current = 0
 
-        return filtered[[
-            'title', 'company_name', 'industry_name', 'location',
-            'formatted_work_type', 'formatted_experience_level',
-            'salary_range', 'listed_date'
-        ]].to_dict('records')
+        return listings_page(
+            tuple(titles or ()),
+            tuple(industries or ()),
+            tuple(companies or ()),
+            page_current or 0,
+            page_size,
+            tuple((s['column_id'], s['direction']) for s in sort_by or ()),
+            filter_query or ''
+        )
 
 # Export
 __all__ = ['get_listings_component', 'register_listings_callbacks']
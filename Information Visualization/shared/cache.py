@@ -0,0 +1,4 @@
+from flask_caching import Cache
+
+# Memoizes callback results; bound to the Dash server in app.py
+cache = Cache()
@@ -0,0 +1,60 @@
+import inspect
+from pathlib import Path
+import pandas as pd
+from shared.utils import job_titles
+
+JOBS_CSV = Path('data/cleaned.csv')
+JOBS_PARQUET = Path('data/cleaned.parquet')
+
+# Columns of cleaned.csv used by any tab ('Days' is optional)
+JOBS_COLUMNS = [
+    'job_id', 'title', 'company_name', 'original_listed_time', 'Days',
+    'min_salary', 'max_salary', 'location', 'formatted_work_type', 'formatted_experience_level'
+]
+
+
+def load_jobs():
+    # Parquet copy is only trusted if newer than the CSV and the code that built it
+    sources = [JOBS_CSV, Path(__file__), Path(inspect.getfile(job_titles))]
+    if JOBS_PARQUET.exists() and all(JOBS_PARQUET.stat().st_mtime >= p.stat().st_mtime for p in sources):
+        return pd.read_parquet(JOBS_PARQUET)
+
+    jobs = pd.read_csv(
+        JOBS_CSV,
+        usecols=lambda col: col in JOBS_COLUMNS,
+        dtype={'company_name': 'category'}
+    )
+    jobs = job_titles(jobs)
+
+    # Categorical columns make isin/groupby work on integer codes; title is
+    # converted after job_titles since cleaning rewrites its values
+    jobs['title'] = jobs['title'].astype('category')
+
+    # Epoch milliseconds -> UTC timestamps, parsed once for every tab
+    jobs['original_listed_time'] = pd.to_datetime(jobs['original_listed_time'], unit='ms', utc=True)
+
+    try:
+        jobs.to_parquet(JOBS_PARQUET)
+    except ImportError:
+        pass  # no pyarrow/fastparquet installed, keep reading the CSV
+    except OSError:
+        # data/ unwritable or disk full: the cache is optional, but a partial
+        # file would later pass the mtime check, so drop it if we can
+        try:
+            JOBS_PARQUET.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    return jobs
+
+
+# Load each dataset once; every tab imports these frames instead of re-reading the CSVs
+df_jobs = load_jobs()
+
+# Map industry IDs to names
+df_industries = pd.read_csv('data/job_industries.csv')
+ind = pd.read_csv('data/industries.csv')
+industry_mapping = dict(zip(ind['industry_id'], ind['industry_name']))
+df_industries['industry_name'] = df_industries['industry_id'].map(industry_mapping).astype('category')
+
+__all__ = ['df_jobs', 'df_industries']
@@ -1,13 +1,14 @@
 # Jupyter Notebook: RL_ZerothOrder.ipynb, downloaded as Python script for size constraints.
 
+import warnings
 import gymnasium as gym
 import torch
 import torch.nn as nn
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import datetime
-import copy
 
 #Hyperparameters and configuration
 NUM_EPISODES = 5000                      # Number of training episodes - iterations of the algorithm
@@ -19,31 +20,71 @@ LEARNING_RATE = 0.02
 
 # Random seed for reproducibility
 SEED = 0
+MAX_EPISODE_STEPS = 500
 DEVICE = "cpu"
+USE_TORCHSCRIPT = True      # script the policy forward; False runs it eagerly
 
+# Forwards here are single samples or a small batch, extra intra-op threads only add contention
+torch.set_num_threads(1)
+if torch.get_num_interop_threads() != 1:   # torch refuses a second call in the same process
+    torch.set_num_interop_threads(1)
+torch.set_default_dtype(torch.float32)   # weights, noise and observation buffers all stay float32
 
 
-class LandEnvironment:
-    def __init__(self, render=False):
-        self.env = gym.make("LunarLander-v3", continuous=True, render_mode="human" if render else None)
-        self.env = gym.wrappers.TimeLimit(self.env, max_episode_steps=500)
 
-    #Evaluate Policy 
-    def evaluate_policy(self, policy_net, episodes, seed=None):
-        total_reward = 0.0
+# The raw LunarLander under a single TimeLimit: the env clips actions to [-1, 1] itself, so the
+# order-enforcing and env-checker wrappers from gym.make would only add Python calls to every step
+def make_land_env():
+    env = gym.make("LunarLander-v3", continuous=True)
+    return gym.wrappers.TimeLimit(env.unwrapped, max_episode_steps=MAX_EPISODE_STEPS)
+
+
+# Two copies of the environment on the same episode seeds, one per side of the antithetic pair
+class AntitheticEnvironment:
+    def __init__(self):
+        self.envs = gym.vector.SyncVectorEnv([make_land_env, make_land_env])
+        self.obs_dim = self.envs.single_observation_space.shape[0]
+        self.act_dim = self.envs.single_action_space.shape[0]
+        self._obs_buf = torch.empty(self.envs.observation_space.shape, dtype=torch.float32)  # reused every step
+
+    #Evaluate both perturbed policies in lock-step, one batched forward per step
+    @torch.inference_mode()
+    def evaluate_pair(self, policy_pair, episodes, seed=None):
+        total_rewards = np.zeros(2)
         for i in range(episodes):
-            state, _ = self.env.reset(seed=(seed + i if seed else None))
-            done, truncated = False, False
-            while not (done or truncated):
-                state_tensor = torch.tensor(state, dtype=torch.float32).to(DEVICE)
-                action = policy_net(state_tensor).detach().cpu().numpy()
-                state, reward, done, truncated, _ = self.env.step(action)
-                total_reward += reward
-        return total_reward / episodes
+            states, _ = self.envs.reset(seed=([seed + i] * 2 if seed else None))
+            active = np.ones(2, dtype=bool)
+            while active.any():
+                self._obs_buf.copy_(torch.from_numpy(states))
+                actions = policy_pair(self._obs_buf).numpy()
+                states, rewards, dones, truncated, _ = self.envs.step(actions)
+                total_rewards += rewards * active   # the env that finished first keeps stepping, its rewards are ignored
+                active &= ~(dones | truncated)
+        return total_rewards / episodes
    
 
 
+# torch.jit.script is deprecated in favour of torch.compile, which measured slower for these
+# small forward, so only its deprecation notice is silenced. With USE_TORCHSCRIPT off (or once
+# TorchScript is gone) the same function simply runs eagerly.
+def script(fn):
+    if not USE_TORCHSCRIPT or not hasattr(torch.jit, "script"):
+        return fn
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message=r"`torch\.jit\.script` is deprecated", category=FutureWarning)
+        return torch.jit.script(fn)
+
+
+# TorchScript forward pass on raw weights, so parameter updates stay on the eager modules
+@script
+def batched_policy_forward(W1, b1, W2, b2, x):
+    h = torch.tanh(torch.baddbmm(b1.unsqueeze(-1), W1, x.unsqueeze(-1)))
+    # squeezing the contiguous (batch, out, 1) result keeps it contiguous, so .numpy() on it is zero-copy
+    return torch.tanh(torch.baddbmm(b2.unsqueeze(-1), W2, h)).squeeze(-1)
+
+
 # Creating policy network by using simple neural network with 8 inputs, 128 hidden neurons, and 2 outputs.
+# It holds the weights being optimised; rollouts run its perturbations through BatchedPolicyNet below.
 class PolicyNet(nn.Module):
     def __init__(self, input_dim:int, output_dim:int, hidden_dim: int = 128):
         super().__init__()
@@ -56,11 +97,34 @@ class PolicyNet(nn.Module):
         for param in self.parameters():
             param.requires_grad = False 
 
-    def forward(self, x):          
-        return self.network(x)
 
-    def clone(self):
-        return copy.deepcopy(self) # deep copy for perturbation / evaluation
+# Several PolicyNets as stacked weights, here the negative and positive perturbation of the policy
+class BatchedPolicyNet(nn.Module):
+    def __init__(self, batch_size:int, input_dim:int, output_dim:int, hidden_dim: int = 128):
+        super().__init__()
+        # same parameter order and shapes as PolicyNet, with a leading batch dimension
+        self.W1 = nn.Parameter(torch.zeros(batch_size, hidden_dim, input_dim), requires_grad=False)
+        self.b1 = nn.Parameter(torch.zeros(batch_size, hidden_dim), requires_grad=False)
+        self.W2 = nn.Parameter(torch.zeros(batch_size, output_dim, hidden_dim), requires_grad=False)
+        self.b2 = nn.Parameter(torch.zeros(batch_size, output_dim), requires_grad=False)
+        self.param_list = [self.W1, self.b1, self.W2, self.b2]
+
+    def forward(self, x):          # x is (batch, input_dim), one state per policy
+        return batched_policy_forward(self.W1, self.b1, self.W2, self.b2, x)
+
+
+# One flat buffer holding the noise for every policy parameter, refilled with a single RNG call
+class ParameterNoise:
+    def __init__(self, policy, generator=None):
+        self.generator = generator
+        sizes = [param.numel() for param in policy.parameters()]
+        self.buffer = torch.empty(sum(sizes))
+        self.views = [chunk.view(param.shape)
+                      for param, chunk in zip(policy.parameters(), torch.split(self.buffer, sizes))]
+
+    def sample(self, std_dev):
+        torch.randn(self.buffer.shape, out=self.buffer, generator=self.generator).mul_(std_dev)
+        return self.views
 
 
 # Logging episode performances
@@ -68,7 +132,7 @@ class EpisodeLogger:
     def __init__(self, file_name):
         self.log_path = Path("logs") / file_name
         self.log_path.parent.mkdir(exist_ok=True)
-        self.log_file = open(self.log_path, 'w')
+        self.log_file = open(self.log_path, 'w', buffering=65536)  # flushed on close, not once per episode
         self.start_time = datetime.now()
 
     # Write the episode number and return to the log
@@ -81,26 +145,21 @@ class EpisodeLogger:
 
 
 # Zeroth-order optimization method
-def zeroth_order(policy, std_dev, learning_rate, environment):
+def zeroth_order(policy_params, policy_pair, std_dev, learning_rate, environment, parameter_noise):
 
-    perturbations = {}  
-    policy_pos = policy.clone() # positive perturbaton of the policy
-    policy_neg = policy.clone() # negative perturbation of policy
+    noise_list = parameter_noise.sample(std_dev)     # Gaussian noise per parameter, in policy_params order
 
-    for name, param in policy.named_parameters():    # Apply perturbation to each parameter
-        noise = torch.randn_like(param) * std_dev    # Generate Gaussian noise
-        perturbations[name] = noise
-        policy_pos.state_dict()[name].copy_(param + noise)  #apply positive perturbation
-        policy_neg.state_dict()[name].copy_(param - noise)  #apply negative perturbation
+    # Apply perturbation to each parameter, the pair holds [policy - noise, policy + noise]
+    for param, pair_param, noise in zip(policy_params, policy_pair.param_list, noise_list):
+        torch.sub(param, noise, out=pair_param[0])  #apply negative perturbation
+        torch.add(param, noise, out=pair_param[1])  #apply positive perturbation
  
-    # Evaluate both perturbed policies
-    pos_score = environment.evaluate_policy(policy_pos, NUM_EVALUATIONS_PER_EPISODE)
-    neg_score = environment.evaluate_policy(policy_neg, NUM_EVALUATIONS_PER_EPISODE)
+    # Evaluate both perturbed policies on the same episodes, so the antithetic pair shares its env noise
+    seed = np.random.randint(0, 2 ** 31 - 1)
+    neg_score, pos_score = environment.evaluate_pair(policy_pair, NUM_EVALUATIONS_PER_EPISODE, seed=seed).tolist()
     
-    #Estimate gradient and update original policy parameters
-    for name, param in policy.named_parameters():
-        gradient = (pos_score - neg_score) / 2 * perturbations[name]
-        param.data += learning_rate * gradient
+    #Estimate gradient and update original policy parameters, one multi-tensor op for all of them
+    torch._foreach_add_(policy_params, noise_list, alpha=learning_rate * (pos_score - neg_score) / 2)
 
     #Return best score from both perturbations
     return max(pos_score, neg_score)
@@ -112,14 +171,19 @@ def train():
     np.random.seed(SEED)
 
     #initialize environment and policy
-    env = LandEnvironment()    
-    policy = PolicyNet(env.env.observation_space.shape[0], env.env.action_space.shape[0])
+    env = AntitheticEnvironment()    
+    obs_dim, act_dim = env.obs_dim, env.act_dim
+    policy = PolicyNet(obs_dim, act_dim)
     policy.to(DEVICE)
+    policy_params = list(policy.parameters())   # module structure is fixed, so walk it once
+    policy_pair = BatchedPolicyNet(2, obs_dim, act_dim)
+    policy_pair.to(DEVICE)
+    parameter_noise = ParameterNoise(policy, torch.Generator(device=DEVICE).manual_seed(SEED))
 
     logger = EpisodeLogger(f"zeroth_rl_E{NUM_EVALUATIONS_PER_EPISODE}_std{PERT_STD_DEV}_lr{LEARNING_RATE}.log")
 
     for episode in range(1, NUM_EPISODES):
-        reward = zeroth_order(policy, PERT_STD_DEV, LEARNING_RATE, env)
+        reward = zeroth_order(policy_params, policy_pair, PERT_STD_DEV, LEARNING_RATE, env, parameter_noise)
         logger.write(episode, reward)
 
     logger.close()
@@ -129,7 +193,8 @@ def train():
 
 #Plotting reward over time, with x as Episode number and y as Reward
 def plot_log(log_file_path):
-    data = np.loadtxt(log_file_path, delimiter=",")
+    data = pd.read_csv(log_file_path, header=None, names=["episode", "reward"],
+                       skipinitialspace=True, dtype=np.float32).to_numpy()
     x = data[:, 0]
     y = data[:, 1]
     smooth_factor = max(len(x) // 100, 1)  